@@ -3,28 +3,56 @@ import os
 import zipfile
 import tempfile
 import shutil
+import stat
 import subprocess
-import gc
 import time
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice, groupby
+from functools import lru_cache
+from importlib.util import find_spec
 from datetime import datetime, timedelta
-from pathlib import Path
 
 from PySide6.QtWidgets import (
     QApplication, QWidget, QPushButton, QVBoxLayout, QFileDialog,
     QTreeWidget, QTreeWidgetItem, QLabel, QMessageBox, QHBoxLayout,
     QAbstractItemView, QSpinBox, QFormLayout, QProgressBar,
-    QSizePolicy, QComboBox
+    QComboBox
 )
 try:
     from PySide6.QtWidgets import QShortcut
 except Exception:
     from PySide6.QtGui import QShortcut
 
-from PySide6.QtGui import QPixmap, QImage, QDragEnterEvent, QDropEvent, QKeySequence, QFont
-from PySide6.QtCore import Qt, QThread, Signal, QEvent, QTimer
+from PySide6.QtGui import QPixmap, QImage, QImageReader, QDropEvent, QKeySequence, QFont, QDesktopServices
+from PySide6.QtCore import Qt, QThread, Signal, QEvent, QTimer, QUrl
 from PIL import Image
 
+# img2pdf is optional and only needed once a conversion runs: check that it is
+# installed without importing it, the import itself happens in load_img2pdf()
+HAS_IMG2PDF = find_spec('img2pdf') is not None
+_img2pdf = None
+_IMG2PDF_OPTS = {}
+
+
+def load_img2pdf():
+    global _img2pdf, _IMG2PDF_OPTS, HAS_IMG2PDF
+    if _img2pdf is None and HAS_IMG2PDF:
+        try:
+            import img2pdf
+            # pin the built-in writer so img2pdf doesn't probe for pikepdf/pdfrw
+            _IMG2PDF_OPTS = {'engine': img2pdf.Engine.internal} if hasattr(img2pdf, 'Engine') else {}
+            # out-of-range EXIF orientations (0 is common from phones/scanners) are
+            # ignored instead of failing the whole PDF
+            if hasattr(img2pdf, 'Rotation'):
+                _IMG2PDF_OPTS['rotation'] = img2pdf.Rotation.ifvalid
+            _img2pdf = img2pdf
+        except Exception:
+            HAS_IMG2PDF = False
+    return _img2pdf
+
 # ---------------- i18n ----------------
 LANG_FA = 'fa'
 LANG_EN = 'en'
@@ -42,6 +70,7 @@ STRINGS = {
         'remove': "✖ Remove Selected",
         'res_scale': "Resolution Scale (%):",
         'jpeg_quality': "JPEG Quality (%):",
+        'subsampling': "Chroma Subsampling:",
         'no_images': "No images selected.",
         'zip_error': "Failed to open ZIP:",
         'created': "PDF created:",
@@ -76,6 +105,7 @@ STRINGS = {
         'remove': "✖ حذف انتخاب‌شده",
         'res_scale': "مقیاس رزولوشن (%):",
         'jpeg_quality': "کیفیت JPEG (%):",
+        'subsampling': "زیرنمونه‌برداری رنگ:",
         'no_images': "تصویری انتخاب نشده.",
         'zip_error': "باز کردن ZIP با خطا مواجه شد:",
         'created': "PDF ساخته شد:",
@@ -103,11 +133,64 @@ STRINGS = {
 # ---------------- utilities ----------------
 
 IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp')
+_IMAGE_EXT_SET = frozenset(IMAGE_EXTS)
+
+
+def is_image_name(name):
+    # lowercases only the extension, then a single set lookup
+    return name[name.rfind('.'):].lower() in _IMAGE_EXT_SET
+
+# tree item payload: plain strings in two roles instead of a dict per item
+# (dicts round-trip through QVariantMap and get copied on every data() call)
+ROLE_KIND = Qt.UserRole           # 'group' or 'image'
+ROLE_VALUE = Qt.UserRole + 1      # group key or image path
+KIND_GROUP = 'group'
+KIND_IMAGE = 'image'
+
+PREVIEW_CACHE_SIZE = 16
+PDF_APPEND_BATCH = 4        # pages decoded at once by the Pillow PDF fallback
+SUBSAMPLING_MODES = ('4:2:0', '4:2:2', '4:4:4')    # JPEG chroma subsampling choices, smallest first
+ENCODE_WORKERS = max(1, min(8, os.cpu_count() or 1))   # page encoder threads per conversion
+PROGRESS_INTERVAL = 0.05    # seconds between progress signals (~20 per second)
+PDF_WRITE_BUFFER = 1024 * 1024
+ZIP_WORKERS = max(1, min(8, os.cpu_count() or 1))      # concurrent ZIP entry extractors
+
+
+_NAT_SPLIT = re.compile(r"(\d+)")
+_UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9_.-]')
+_SCALE_BEFORE_CONVERT = frozenset(('CMYK', 'YCbCr', 'LAB', 'HSV'))
+# EXIF orientation -> transpose that makes the pixels upright (as ImageOps.exif_transpose);
+# passthrough JPEGs keep their tag and are rotated by img2pdf, which only handles 3/6/8
+_EXIF_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+_PASSTHROUGH_ORIENTATIONS = frozenset((3, 6, 8))
+_SWAPS_AXES = frozenset((5, 6, 7, 8))
+DEFAULT_DPI = 96.0      # img2pdf's default for images without a resolution
 
 
+def page_dpi(im):
+    # source resolution by img2pdf's rule (rounded, missing or zero -> default), so
+    # passthrough and re-encoded pages of the same size get the same page size
+    try:
+        dx, dy = (int(round(v)) for v in im.info['dpi'])
+        if dx > 0 and dy > 0:
+            return dx, dy
+    except Exception:
+        pass
+    return DEFAULT_DPI, DEFAULT_DPI
+
+
+@lru_cache(maxsize=8192)
 def natural_key(s: str):
-    parts = re.split(r"(\d+)", s)
-    return [int(p) if p.isdigit() else p.lower() for p in parts]
+    # cached: the same names get re-keyed on every load/sort
+    return tuple(int(p) if p.isdigit() else p.lower() for p in _NAT_SPLIT.split(s))
 
 
 def ensure_dir(path):
@@ -117,6 +200,158 @@ def ensure_dir(path):
         pass
 
 
+if sys.platform.startswith('win'):
+    def _long_path(path):
+        # \\?\ lifts the MAX_PATH limit that otherwise leaves deep trees behind
+        path = os.path.abspath(path)
+        if path.startswith('\\\\?\\'):
+            return path
+        if path.startswith('\\\\'):
+            return '\\\\?\\UNC\\' + path[2:]
+        return '\\\\?\\' + path
+else:
+    def _long_path(path):
+        return path
+
+
+def _force_remove(func, path):
+    # retry once with the write bit set (read-only files/dirs fail on Windows)
+    try:
+        func(path)
+    except OSError:
+        try:
+            os.chmod(path, stat.S_IWRITE | stat.S_IREAD | stat.S_IEXEC)
+            func(path)
+        except OSError:
+            pass
+
+
+def _rmtree_walk(path):
+    try:
+        with os.scandir(path) as it:
+            for e in it:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        _rmtree_walk(e.path)
+                    else:
+                        _force_remove(os.unlink, e.path)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+    _force_remove(os.rmdir, path)
+
+
+def _spawn_rm(path):
+    # POSIX only: the path goes to rm as a single argument, never through a shell
+    devnull = subprocess.DEVNULL
+    return subprocess.Popen(['rm', '-rf', '--', path],
+                            stdin=devnull, stdout=devnull, stderr=devnull, start_new_session=True)
+
+
+def remove_tree(path):
+    # blocking removal of one tree: native rm on POSIX, scandir walk as fallback (and
+    # on Windows, where a path handed to cmd would be parsed for & ^ %)
+    if not sys.platform.startswith('win'):
+        try:
+            _spawn_rm(path).wait()
+        except Exception:
+            pass
+    if os.path.lexists(path):
+        try:
+            _rmtree_walk(_long_path(path))
+        except Exception:
+            pass
+
+
+def remove_tree_async(paths, detached=False):
+    # remove trees without blocking the caller; independent trees go concurrently.
+    # detached: the removal has to outlive this process (closing) - POSIX hands each
+    # tree to its own rm session, elsewhere a non-daemon thread finishes before exit.
+    # Otherwise a daemon thread does it (leftovers are swept on the next start)
+    paths = list(paths)
+    if detached and not sys.platform.startswith('win'):
+        left = []
+        for p in paths:
+            try:
+                _spawn_rm(p)
+            except Exception:
+                left.append(p)
+        paths = left
+    if not paths:
+        return
+
+    def work():
+        if len(paths) == 1:
+            remove_tree(paths[0])
+            return
+        with ThreadPoolExecutor(max_workers=min(8, len(paths))) as ex:
+            list(ex.map(remove_tree, paths))
+    threading.Thread(target=work, daemon=not detached).start()
+
+
+def discard_tree(*paths):
+    # rename out of the way (a single metadata op, so the caller returns at once)
+    # and delete the renamed trees on a background thread
+    if not paths:
+        return
+    moved = []
+    for path in paths:
+        try:
+            trash = path + '.trash'
+            os.rename(path, trash)
+            path = trash
+        except OSError:
+            pass
+        moved.append(path)
+    remove_tree_async(moved)
+
+
+# characters Windows rejects in file names, replaced like ZipFile.extract does
+_ZIP_ILLEGAL = str.maketrans(':<>|"?*', '_______')
+
+
+def zip_flat_name(name):
+    # last component of an archive entry as a plain file name: no drive, no
+    # directories, and (on Windows) no characters the filesystem would refuse
+    fname = os.path.splitdrive(name.replace('/', os.sep))[1].rsplit(os.sep, 1)[-1]
+    if os.sep == '\\':
+        fname = fname.translate(_ZIP_ILLEGAL).rstrip('.')
+    return fname or '_'
+
+
+def _extract_chunk(zip_path, jobs):
+    # one ZipFile per thread: a ZipFile shares a single file handle and is not thread-safe
+    failed = []
+    try:
+        z = zipfile.ZipFile(zip_path, 'r')
+    except Exception:
+        return [target for _, target in jobs]
+    with z:
+        for name, target in jobs:
+            try:
+                with z.open(name) as src, open(target, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+            except Exception:
+                failed.append(target)
+                try:
+                    os.remove(target)
+                except Exception:
+                    pass
+    return failed
+
+
+def extract_zip_entries(zip_path, jobs):
+    # stream (entry name, target path) jobs out of the archive, inflating on a few
+    # threads at once (zlib releases the GIL); returns the targets that failed
+    n = min(ZIP_WORKERS, max(1, len(jobs) // 4))
+    if n <= 1:
+        return set(_extract_chunk(zip_path, jobs))
+    with ThreadPoolExecutor(max_workers=n) as ex:
+        results = ex.map(lambda chunk: _extract_chunk(zip_path, chunk), [jobs[i::n] for i in range(n)])
+        return {t for failed in results for t in failed}
+
+
 # ---------------- background cleanup worker ----------------
 class TempCleanupWorker(QThread):
     """Scan system temp for old temp dirs matching our prefixes and remove them.
@@ -127,35 +362,42 @@ class TempCleanupWorker(QThread):
     def __init__(self, prefixes=None, older_than_hours=24):
         super().__init__()
         self._stop = False
+        self.done = threading.Event()           # set once run() has returned (any path)
         self.prefixes = prefixes or ['saino_temp_root_', 'saino_zip_', 'saino_combined_', 'saino_proc_']
         self.older_than = timedelta(hours=older_than_hours)
 
     def run(self):
+        try:
+            self._run()
+        finally:
+            self.done.set()
+
+    def _run(self):
         tmp = tempfile.gettempdir()
-        now = datetime.now()
+        prefixes = tuple(self.prefixes)
+        # compare raw st_mtime against one cutoff instead of a datetime per entry
+        cutoff = (datetime.now() - self.older_than).timestamp()
         try:
-            for name in os.listdir(tmp):
-                if self._stop:
-                    break
-                for p in self.prefixes:
-                    if name.startswith(p):
-                        path = os.path.join(tmp, name)
-                        try:
-                            mtime = datetime.fromtimestamp(os.path.getmtime(path))
-                        except Exception:
-                            mtime = now
-                        if now - mtime > self.older_than:
-                            try:
-                                if os.path.isdir(path):
-                                    shutil.rmtree(path, ignore_errors=True)
-                                else:
-                                    try:
-                                        os.remove(path)
-                                    except Exception:
-                                        pass
-                            except Exception:
-                                pass
+            # scandir: type and stat come from the directory read (no extra stat on Windows)
+            with os.scandir(tmp) as it:
+                for entry in it:
+                    if self._stop:
                         break
+                    if not entry.name.startswith(prefixes):
+                        continue
+                    try:
+                        mtime = entry.stat(follow_symlinks=False).st_mtime
+                    except OSError:
+                        continue
+                    if mtime >= cutoff:
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            remove_tree(entry.path)
+                        else:
+                            os.unlink(entry.path)
+                    except Exception:
+                        pass
         except Exception:
             pass
 
@@ -163,29 +405,134 @@ class TempCleanupWorker(QThread):
         self._stop = True
 
 
+# ---------------- image processing ----------------
+def prepare_page(path, scale, save_opts, passthrough):
+    # turn one source image into a PDF-ready JPEG file
+    # returns (page_file, is_temp, error); runs on the worker's thread pool
+    try:
+        src = Image.open(path)
+    except Exception as e:
+        return None, False, str(e)
+    img = src
+    try:
+        try:
+            orientation = src.getexif().get(0x0112)
+        except Exception:
+            orientation = None
+        transpose = _EXIF_TRANSPOSE.get(orientation)
+        # mirrored orientations are re-encoded so every scale shows the same page
+        if passthrough and src.format == 'JPEG' and (transpose is None or orientation in _PASSTHROUGH_ORIENTATIONS):
+            return path, False, None
+        # pages keep their physical size: a downscaled page gets a proportionally lower dpi
+        src_w, src_h = src.size
+        dpi = page_dpi(src)
+        target = None
+        if scale < 1.0:
+            w, h = src.size
+            target = (max(1, int(w * scale)), max(1, int(h * scale)))
+            # JPEG: let libjpeg decode at 1/2, 1/4 or 1/8 size (kept >= 2x the target,
+            # like thumbnail's reducing_gap) before any mode conversion touches pixels
+            if src.format == 'JPEG':
+                try:
+                    src.draft(None, (target[0] * 2, target[1] * 2))
+                except Exception:
+                    pass
+        if target is not None and img.mode in _SCALE_BEFORE_CONVERT:
+            # plain multi-band modes resample fine as they are: shrink first so the RGB
+            # conversion runs on the small buffer (palette/alpha modes convert first)
+            try:
+                img.thumbnail(target, Image.LANCZOS, reducing_gap=2.0)
+                target = None
+            except Exception as e:
+                return None, False, f'processing failed: {e}'
+        try:
+            # grayscale pages stay single-channel: JPEG/PDF carry 'L' natively and
+            # it is a third of the pixels to resize and encode
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+        except Exception:
+            return None, False, 'convert to RGB failed'
+        tmp_path = None
+        try:
+            if target is not None:
+                # box-reduce to 2x the target first, then LANCZOS on the smaller buffer
+                img.thumbnail(target, Image.LANCZOS, reducing_gap=2.0)
+            dpi = (dpi[0] * img.width / src_w, dpi[1] * img.height / src_h)
+            if transpose is not None:
+                # the re-encoded JPEG carries no EXIF: bake the orientation into the pixels
+                img = img.transpose(transpose)
+                if orientation in _SWAPS_AXES:
+                    dpi = dpi[::-1]
+            fd, tmp_path = tempfile.mkstemp(prefix='saino_proc_', suffix='.jpg')
+            os.close(fd)
+            img.save(tmp_path, dpi=dpi, **save_opts)
+            return tmp_path, True, None
+        except Exception as e:
+            if tmp_path:
+                try:
+                    os.remove(tmp_path)
+                except Exception:
+                    pass
+            return None, False, f'processing failed: {e}'
+    finally:
+        for im in (img, src):
+            try:
+                im.close()
+            except Exception:
+                pass
+
+
 # ---------------- Conversion Worker ----------------
 class ConversionWorker(QThread):
     progress = Signal(int)         # overall processed images count
     finished_signal = Signal(list, list)  # (created_pdfs, skipped_list)
     error = Signal(str)
 
-    def __init__(self, groups_ordered, output_dir, scale, jpeg_quality, clean_after_group=True):
+    def __init__(self, groups_ordered, output_dir, scale, jpeg_quality, subsampling='4:2:0'):
         super().__init__()
         self.groups = groups_ordered
         self.output_dir = output_dir
         self.scale = float(scale)
         self.jpeg_quality = int(jpeg_quality)
-        self._is_canceled = False
-        self.clean_after_group = clean_after_group
+        self.subsampling = subsampling
+        self._cancel = threading.Event()
+        self.done = threading.Event()           # set once run() has returned (any path)
+        self._last_progress = 0.0
+        self._last_emitted = 0                  # processed count of the last progress signal
+        self._progress_step = 1
 
     def run(self):
         try:
+            self._run()
+        finally:
+            self.done.set()
+
+    def _run(self):
+        # run-wide constants, resolved once instead of per group/image
+        scale = self.scale
+        img2pdf = load_img2pdf()
+        # at full scale JPEGs can go into the PDF untouched (img2pdf embeds the original stream)
+        passthrough = img2pdf is not None and scale >= 1.0
+        # Huffman optimization only pays off when these bytes end up in the PDF (img2pdf);
+        # the Pillow fallback decodes and re-encodes them anyway
+        save_opts = {'format': 'JPEG', 'quality': self.jpeg_quality, 'subsampling': self.subsampling,
+                     'optimize': img2pdf is not None}
+        # one bounded pool for the whole run: decode/resize/encode run in parallel
+        # (Pillow releases the GIL in its C code) and pages of the next groups are
+        # already being encoded while the current group's PDF is written
+        ex = ThreadPoolExecutor(max_workers=ENCODE_WORKERS)
+        queued = []
+        try:
+            for group in self.groups:
+                queued.append([ex.submit(prepare_page, p, scale, save_opts, passthrough)
+                               for p in group['paths']])
             created = []
             skipped_all = []
             processed_count = 0
-            total_images = sum(len(g['paths']) for g in self.groups)
-            for group in self.groups:
-                if self._is_canceled:
+            # a step smaller than ~1/200 of the run doesn't move the bar by a pixel
+            self._progress_step = max(1, sum(len(g['paths']) for g in self.groups) // 200)
+            for group, futures in zip(self.groups, queued):
+                if self._cancel.is_set():
                     break
                 name = group['name']
                 paths = group['paths']
@@ -194,83 +541,66 @@ class ConversionWorker(QThread):
                 else:
                     base = os.path.splitext(name)[0]
                 out_pdf = os.path.join(self.output_dir, f"{base}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
-                skipped = self._process_and_save(paths, out_pdf, processed_count, total_images)
+                skipped = self._process_and_save(paths, futures, out_pdf, processed_count, img2pdf)
                 skipped_all.extend(skipped)
                 if os.path.exists(out_pdf):
                     created.append(out_pdf)
-                processed_count += max(1, len(paths))
-                tdir = group.get('tempdir')
-                if self.clean_after_group and tdir:
-                    try:
-                        shutil.rmtree(tdir, ignore_errors=True)
-                    except Exception:
-                        pass
-                if self._is_canceled:
+                processed_count += len(paths)
+                if self._cancel.is_set():
                     break
             self.finished_signal.emit(created, skipped_all)
         except Exception as e:
             self.error.emit(str(e))
+        finally:
+            ex.shutdown(wait=True, cancel_futures=True)
+            # temp files of pages that were encoded but never used (cancel/error)
+            for futures in queued:
+                for fut in futures:
+                    if fut.cancelled():
+                        continue
+                    try:
+                        page, is_tmp, err = fut.result()
+                        if is_tmp:
+                            os.remove(page)
+                    except Exception:
+                        pass
 
     def cancel(self):
-        self._is_canceled = True
+        self._cancel.set()
 
-    def _process_and_save(self, paths, out_pdf, processed_offset, total_images):
-        processed_tmp = []
+    def _process_and_save(self, paths, futures, out_pdf, processed_offset, img2pdf):
+        pages = []              # files embedded into the PDF, in order
+        processed_tmp = []      # our re-encoded temp files (removed afterwards)
         skipped = []
-        local_count = 0
-        for idx, p in enumerate(paths):
-            if self._is_canceled:
-                break
-            local_count += 1
-            try:
-                img = Image.open(p)
-            except Exception as e:
-                skipped.append((p, str(e)))
-                processed_offset += 1
-                self.progress.emit(processed_offset)
-                continue
-            try:
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-            except Exception:
-                skipped.append((p, 'convert to RGB failed'))
-                try:
-                    img.close()
-                except Exception:
-                    pass
+        # results are consumed in input order so page order is preserved
+        consumed = 0
+        try:
+            for p, fut in zip(paths, futures):
+                if self._cancel.is_set():
+                    break
+                page, is_tmp, err = fut.result()
+                consumed += 1
+                if err is not None:
+                    skipped.append((p, err))
+                else:
+                    pages.append(page)
+                    if is_tmp:
+                        processed_tmp.append(page)
                 processed_offset += 1
-                self.progress.emit(processed_offset)
-                continue
-            try:
-                if self.scale < 1.0:
-                    w, h = img.size
-                    img = img.resize((max(1, int(w * self.scale)), max(1, int(h * self.scale))), Image.LANCZOS)
-                fd, tmp_path = tempfile.mkstemp(prefix='saino_proc_', suffix='.jpg')
-                os.close(fd)
-                img.save(tmp_path, format='JPEG', quality=self.jpeg_quality, optimize=True)
-                processed_tmp.append(tmp_path)
-            except Exception as e:
-                skipped.append((p, f'processing failed: {e}'))
-            finally:
-                try:
-                    img.close()
-                except Exception:
-                    pass
-            gc.collect()
-            processed_offset += 1
-            self.progress.emit(processed_offset)
-
-        pil_list = []
-        for f in processed_tmp:
-            try:
-                im = Image.open(f)
-                if im.mode != 'RGB':
-                    im = im.convert('RGB')
-                pil_list.append(im)
-            except Exception as e:
-                skipped.append((f, f'open processed failed: {e}'))
+                # pass through the main thread's event loop at most ~20x/s and only for a
+                # visible step; the last page of a group always gets through
+                now = time.monotonic()
+                if consumed == len(paths) or (now - self._last_progress >= PROGRESS_INTERVAL and
+                                              processed_offset - self._last_emitted >= self._progress_step):
+                    self._last_progress = now
+                    self._last_emitted = processed_offset
+                    self.progress.emit(processed_offset)
+        finally:
+            # whatever is left over is cleaned up by _run once the pool has stopped
+            del futures[:consumed]
 
-        if not pil_list:
+        # last cancellation point before the (uninterruptible) PDF write
+        if not pages or self._cancel.is_set():
             for f in processed_tmp:
                 try:
                     os.remove(f)
@@ -278,32 +608,108 @@ class ConversionWorker(QThread):
                     pass
             return skipped
 
-        first, *others = pil_list
         try:
-            first.save(out_pdf, 'PDF', save_all=True, append_images=others, optimize=True)
+            if img2pdf is not None:
+                # embed the encoded JPEG streams as-is, one page at a time
+                # img2pdf issues many small writes; a large buffer turns them into few syscalls
+                with open(out_pdf, 'wb', buffering=PDF_WRITE_BUFFER) as fh:
+                    img2pdf.convert(pages, outputstream=fh, **_IMG2PDF_OPTS)
+            else:
+                self._save_pdf_pillow(pages, out_pdf, skipped)
         except Exception as e:
             skipped.append((out_pdf, f'save failed: {e}'))
+            try:
+                os.remove(out_pdf)
+            except Exception:
+                pass
         finally:
-            for im in pil_list:
-                try:
-                    im.close()
-                except Exception:
-                    pass
             for f in processed_tmp:
                 try:
                     os.remove(f)
                 except Exception:
                     pass
-            gc.collect()
         return skipped
 
+    def _save_pdf_pillow(self, files, out_pdf, skipped):
+        # fallback without img2pdf: write the PDF in small batches (append=True adds to
+        # the file written so far) so only a few decoded pages are alive at a time
+        written = False
+        for i in range(0, len(files), PDF_APPEND_BATCH):
+            batch = []
+            for f in files[i:i + PDF_APPEND_BATCH]:
+                try:
+                    im = Image.open(f)
+                    if im.mode != 'RGB':
+                        im = im.convert('RGB')
+                    batch.append(im)
+                except Exception as e:
+                    skipped.append((f, f'open processed failed: {e}'))
+            if not batch:
+                continue
+            try:
+                # Pillow sizes all pages of one save() by a single dpi: split the batch
+                # into runs of equal resolution so pages match the img2pdf output
+                for dpi, run in groupby(batch, key=page_dpi):
+                    first, *others = run
+                    first.save(out_pdf, 'PDF', save_all=True, append_images=others, append=written, dpi=dpi)
+                    written = True
+            finally:
+                for im in batch:
+                    try:
+                        im.close()
+                    except Exception:
+                        pass
+
+
+# ---------------- Preview Loader ----------------
+class PreviewLoader(QThread):
+    loaded = Signal(object, QImage)     # (cache key, image - null if unreadable)
+
+    def __init__(self, key):
+        super().__init__()
+        self.key = key
+        self.done = threading.Event()           # set once run() has returned (any path)
+
+    def run(self):
+        try:
+            self._run()
+        finally:
+            self.done.set()
+
+    def _run(self):
+        path, w, h = self.key
+        img = QImage()
+        try:
+            # decode directly at preview size (JPEG uses DCT scaling) instead of full-res + rescale
+            reader = QImageReader(path)
+            reader.setAutoTransform(True)
+            orig = reader.size()
+            if orig.isValid():
+                reader.setScaledSize(orig.scaled(w, h, Qt.KeepAspectRatio))
+            img = reader.read()
+            if not img.isNull() and (img.width() > w or img.height() > h):
+                img = img.scaled(w, h, Qt.KeepAspectRatio, Qt.FastTransformation)
+        except Exception:
+            img = QImage()
+        self.loaded.emit(self.key, img)
+
+
+# ---------------- Group Tree ----------------
+class GroupTree(QTreeWidget):
+    # InternalMove drops are handled by the tree itself, not the window: report them
+    dropped = Signal()
+
+    def dropEvent(self, e: QDropEvent):
+        super().dropEvent(e)
+        self.dropped.emit()
+
 
 # ---------------- Main Window ----------------
 class ImageToPDF(QWidget):
     def __init__(self):
         super().__init__()
         self.lang = LANG_FA
-        self.t = lambda k: STRINGS[self.lang].get(k, k)
+        self._s = STRINGS[self.lang]        # active string table, rebound on language toggle
 
         self.setWindowTitle(self.t('title'))
         # Use normal window flags (so it appears in taskbar)
@@ -314,7 +720,7 @@ class ImageToPDF(QWidget):
         self.setMaximumWidth(1400)
 
         # Tree (left)
-        self.tree = QTreeWidget()
+        self.tree = GroupTree()
         self.tree.setHeaderHidden(True)
         self.tree.setSelectionMode(QAbstractItemView.SingleSelection)
         # enable internal drag & drop move
@@ -331,23 +737,23 @@ class ImageToPDF(QWidget):
         self.preview_label.setStyleSheet("background:#0f0f0f; border:1px solid #2b2b2b; color:#ddd; padding:8px;")
         preview_font = QFont(); preview_font.setPointSize(11); self.preview_label.setFont(preview_font)
 
+        # widgets whose text follows the active language: widget -> string key
+        self._i18n_widgets = {}
+
         # Buttons & controls
         # Top buttons above preview
-        self.load_folder_btn = QPushButton(self.t('load_folder'))
-        self.load_folder_btn.clicked.connect(self.load_folder)
-        self.load_zip_btn = QPushButton(self.t('load_zip'))
-        self.load_zip_btn.clicked.connect(self.load_zip)
+        self.load_folder_btn = self._mkbtn('load_folder', self.load_folder)
+        self.load_zip_btn = self._mkbtn('load_zip', self.load_zip)
 
         # Bottom buttons below preview
-        self.up_btn = QPushButton(self.t('move_up')); self.up_btn.clicked.connect(self.move_up)
-        self.down_btn = QPushButton(self.t('move_down')); self.down_btn.clicked.connect(self.move_down)
-        self.remove_btn = QPushButton(self.t('remove')); self.remove_btn.clicked.connect(self.remove_selected)
-        self.clear_btn = QPushButton(self.t('clear')); self.clear_btn.clicked.connect(self.clear_all)
-        self.convert_btn = QPushButton(self.t('convert')); self.convert_btn.clicked.connect(self.convert_to_pdf)
+        self.up_btn = self._mkbtn('move_up', self.move_up)
+        self.down_btn = self._mkbtn('move_down', self.move_down)
+        self.remove_btn = self._mkbtn('remove', self.remove_selected)
+        self.clear_btn = self._mkbtn('clear', self.clear_all)
+        self.convert_btn = self._mkbtn('convert', self.convert_to_pdf)
 
         # Language toggle button
-        self.lang_btn = QPushButton(self.t('lang_toggle'))
-        self.lang_btn.clicked.connect(self.toggle_language)
+        self.lang_btn = self._mkbtn('lang_toggle', self.toggle_language)
 
         # Sort combobox
         self.sort_combo = QComboBox()
@@ -357,9 +763,16 @@ class ImageToPDF(QWidget):
         # Controls: resolution scale and jpeg quality
         self.scale_spin = QSpinBox(); self.scale_spin.setRange(10, 100); self.scale_spin.setValue(100); self.scale_spin.setSuffix('%')
         self.jpeg_spin = QSpinBox(); self.jpeg_spin.setRange(10, 100); self.jpeg_spin.setValue(95); self.jpeg_spin.setSuffix('%')
+        self.scale_label = self._mklabel('res_scale')
+        self.jpeg_label = self._mklabel('jpeg_quality')
+        # 4:2:0 halves chroma resolution (smallest pages); 4:4:4 keeps full colour detail
+        self.subsampling_combo = QComboBox(); self.subsampling_combo.addItems(SUBSAMPLING_MODES)
+        self.subsampling_label = self._mklabel('subsampling')
         form = QFormLayout()
-        form.addRow(self.t('res_scale'), self.scale_spin)
-        form.addRow(self.t('jpeg_quality'), self.jpeg_spin)
+        form.addRow(self.scale_label, self.scale_spin)
+        form.addRow(self.jpeg_label, self.jpeg_spin)
+        form.addRow(self.subsampling_label, self.subsampling_combo)
+        self.sort_label = self._mklabel('sort_label')
 
         # Layout assembly
         top_btn_layout = QHBoxLayout()
@@ -367,7 +780,7 @@ class ImageToPDF(QWidget):
         top_btn_layout.addWidget(self.load_zip_btn)
         top_btn_layout.addStretch()
         top_btn_layout.addWidget(self.lang_btn)
-        top_btn_layout.addWidget(QLabel(self.t('sort_label')))
+        top_btn_layout.addWidget(self.sort_label)
         top_btn_layout.addWidget(self.sort_combo)
 
         bottom_btn_layout = QHBoxLayout()
@@ -391,10 +804,22 @@ class ImageToPDF(QWidget):
 
         # internal data
         self.base_temp_root = tempfile.mkdtemp(prefix='saino_temp_root_')
+        self._default_out_dir = os.path.join(os.getcwd(), 'output_pdfs')
         self.group_tempdirs = {}            # group_key -> tempdir (or None)
         self.source_map = {}                # child_path -> group_key
         self.loaded_zip_order = []          # list of group keys in insertion order
         self.group_order = {}               # group_key -> list of child paths (in insertion order)
+        self.group_paths = {}               # group_key -> set of child paths (duplicate check)
+        self._preview_cache = OrderedDict() # (path, w, h) -> QPixmap, most recent last
+        self._preview_loaders = set()       # PreviewLoader threads still decoding
+        self._preview_wanted = None         # key of the preview that should be on screen
+        # one pending resync for a burst of drops instead of one per drop
+        self._remap_timer = QTimer(self)
+        self._remap_timer.setSingleShot(True)
+        self._remap_timer.setInterval(20)
+        self._remap_timer.timeout.connect(self._rebuild_all_mappings)
+        # resync mappings after InternalMove; restarting coalesces rapid drops
+        self.tree.dropped.connect(self._remap_timer.start)
 
         # Drag/drop
         self.setAcceptDrops(True)
@@ -413,10 +838,28 @@ class ImageToPDF(QWidget):
         left_layout.addWidget(self.progress_bar)
 
         self.worker = None
+        self._retired_workers = set()       # canceled workers still winding down
+        self._closing = False
 
         # start background cleanup (non-blocking) to remove old orphan temp dirs
         self._start_background_cleanup()
 
+    def t(self, k):
+        return self._s.get(k, k)
+
+    # translatable widgets are registered at creation, so a language switch
+    # only walks this registry (no widget-tree scans)
+    def _mkbtn(self, key, slot):
+        b = QPushButton(self.t(key))
+        b.clicked.connect(slot)
+        self._i18n_widgets[b] = key
+        return b
+
+    def _mklabel(self, key):
+        lbl = QLabel(self.t(key))
+        self._i18n_widgets[lbl] = key
+        return lbl
+
     # prevent maximizing/fullscreen attempts
     def changeEvent(self, ev):
         if ev.type() == QEvent.WindowStateChange:
@@ -432,29 +875,26 @@ class ImageToPDF(QWidget):
         self.cleanup_worker = TempCleanupWorker(older_than_hours=24)
         self.cleanup_worker.start()
 
-    # drag/drop override to resync mappings after InternalMove
-    def dropEvent(self, e: QDropEvent):
-        super().dropEvent(e)
-        QTimer.singleShot(20, self._rebuild_all_mappings)
-
     def _rebuild_all_mappings(self):
         new_group_order = {}
         new_loaded_zip_order = []
         new_source_map = {}
+        new_group_paths = {}
         for i in range(self.tree.topLevelItemCount()):
             root = self.tree.topLevelItem(i)
-            d = root.data(0, Qt.UserRole)
-            if not d or d.get('type') != 'group':
+            if root.data(0, ROLE_KIND) != KIND_GROUP:
                 continue
-            key = d.get('key')
+            key = root.data(0, ROLE_VALUE)
             new_loaded_zip_order.append(key)
             lst = []
             for j in range(root.childCount()):
-                cp = root.child(j).data(0, Qt.UserRole).get('path')
+                cp = root.child(j).data(0, ROLE_VALUE)
                 lst.append(cp)
                 new_source_map[cp] = key
             new_group_order[key] = lst
+            new_group_paths[key] = set(lst)
         self.group_order = new_group_order
+        self.group_paths = new_group_paths
         self.loaded_zip_order = new_loaded_zip_order
         self.source_map = new_source_map
 
@@ -464,11 +904,15 @@ class ImageToPDF(QWidget):
         if not folder: return
         basename = os.path.basename(folder)
         self._ensure_group(basename, basename)
-        entries = [f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTS)]
-        entries.sort(key=natural_key)
-        for ent in entries:
-            full = os.path.join(folder, ent)
-            self._add_child(basename, full)
+        # scandir: names/paths come ready-made and the file type is cached from the dir read
+        with os.scandir(folder) as it:
+            entries = [e for e in it if is_image_name(e.name) and e.is_file()]
+        entries.sort(key=lambda e: natural_key(e.name))
+        self._freeze_tree()
+        try:
+            self._add_children(basename, [ent.path for ent in entries])
+        finally:
+            self._thaw_tree()
         self.group_tempdirs[basename] = None
 
     def load_zip(self):
@@ -481,48 +925,61 @@ class ImageToPDF(QWidget):
     def _add_zip_group(self, zip_path, clear_first=False):
         basename = os.path.basename(zip_path)
         # create a unique tempdir for this zip inside base_temp_root
-        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', basename)
+        safe_name = _UNSAFE_CHARS.sub('_', basename)
         group_temp = tempfile.mkdtemp(prefix=f'saino_zip_{safe_name}_', dir=self.base_temp_root)
         try:
             with zipfile.ZipFile(zip_path, 'r') as z:
                 # collect image entries
-                names = [n for n in z.namelist() if n.lower().endswith(IMAGE_EXTS)]
-                names.sort(key=natural_key)
-                self._ensure_group(basename, basename)
-                for name in names:
-                    try:
-                        # extract preserving internal path but under group_temp
-                        extracted = z.extract(name, group_temp)
-                    except Exception:
-                        continue
-                    # normalize path
-                    extracted = os.path.normpath(extracted)
-                    # if extracted is a directory (entry had trailing slash), scan inside
-                    if os.path.isdir(extracted):
-                        for root, _, files in os.walk(extracted):
-                            for f in files:
-                                if f.lower().endswith(IMAGE_EXTS):
-                                    self._add_child(basename, os.path.join(root, f))
-                    else:
-                        if os.path.splitext(extracted)[1].lower() in IMAGE_EXTS:
-                            self._add_child(basename, extracted)
-                self.group_tempdirs[basename] = group_temp
-                if basename not in self.loaded_zip_order:
-                    self.loaded_zip_order.append(basename)
+                names = [n for n in z.namelist() if is_image_name(n)]
+            names.sort(key=natural_key)
+            self._ensure_group(basename, basename)
+            # map each entry flat into group_temp (no nested dirs re-created);
+            # same-named entries from different internal folders get a counter
+            used = set()
+            jobs = []
+            for name in names:
+                fname = zip_flat_name(name)
+                stem, ext = os.path.splitext(fname)
+                n = 1
+                while fname.lower() in used:
+                    fname = f"{stem}_{n}{ext}"
+                    n += 1
+                used.add(fname.lower())
+                jobs.append((name, os.path.join(group_temp, fname)))
+            failed = extract_zip_entries(zip_path, jobs)
+            self._freeze_tree()
+            try:
+                self._add_children(basename, [t for _, t in jobs if t not in failed])
+            finally:
+                self._thaw_tree()
+            self.group_tempdirs[basename] = group_temp
+            if basename not in self.loaded_zip_order:
+                self.loaded_zip_order.append(basename)
         except Exception as e:
             try:
-                shutil.rmtree(group_temp, ignore_errors=True)
+                discard_tree(group_temp)
             except Exception:
                 pass
             QMessageBox.warning(self, self.t('title'), f"{self.t('zip_error')} {e}")
 
     # ------------ tree helpers ------------
+    def _freeze_tree(self):
+        # suspend repaints and item signals while many items are added/reordered
+        self.tree.setUpdatesEnabled(False)
+        self.tree.blockSignals(True)
+
+    def _thaw_tree(self):
+        self.tree.blockSignals(False)
+        self.tree.setUpdatesEnabled(True)
+        self.tree.viewport().update()
+
     def _ensure_group(self, key, display_name):
         root = self._find_group_item(key)
         if root is None:
             root = QTreeWidgetItem(self.tree)
             root.setText(0, display_name)
-            root.setData(0, Qt.UserRole, {'type': 'group', 'key': key})
+            root.setData(0, ROLE_KIND, KIND_GROUP)
+            root.setData(0, ROLE_VALUE, key)
             root.setExpanded(True)
             root.setFirstColumnSpanned(True)
             font = root.font(0); font.setBold(True); root.setFont(0, font)
@@ -536,127 +993,179 @@ class ImageToPDF(QWidget):
     def _find_group_item(self, key):
         for i in range(self.tree.topLevelItemCount()):
             it = self.tree.topLevelItem(i)
-            d = it.data(0, Qt.UserRole)
-            if d and d.get('type') == 'group' and d.get('key') == key:
+            if it.data(0, ROLE_KIND) == KIND_GROUP and it.data(0, ROLE_VALUE) == key:
                 return it
         return None
 
-    def _add_child(self, group_key, child_path):
+    def _add_children(self, group_key, child_paths):
         root = self._ensure_group(group_key, group_key)
-        child_path = os.path.normpath(child_path)
         # avoid duplicates
-        for i in range(root.childCount()):
-            if root.child(i).data(0, Qt.UserRole).get('path') == child_path:
-                return
-        child = QTreeWidgetItem(root)
-        child.setText(0, os.path.basename(child_path))
-        child.setData(0, Qt.UserRole, {'type': 'image', 'path': child_path})
-        # make draggable
-        child.setFlags(child.flags() | Qt.ItemIsDragEnabled | Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-        root.addChild(child)
-        self.source_map[child_path] = group_key
-        # maintain insertion order
-        if group_key not in self.group_order:
-            self.group_order[group_key] = []
-        self.group_order[group_key].append(child_path)
+        seen = self.group_paths.setdefault(group_key, set())
+        order = self.group_order.setdefault(group_key, [])
+        items = []
+        for child_path in child_paths:
+            child_path = os.path.normpath(child_path)
+            if child_path in seen:
+                continue
+            seen.add(child_path)
+            # built without a parent so the whole batch is attached in one addChildren call
+            child = QTreeWidgetItem()
+            child.setText(0, os.path.basename(child_path))
+            child.setData(0, ROLE_KIND, KIND_IMAGE)
+            child.setData(0, ROLE_VALUE, child_path)
+            # make draggable
+            child.setFlags(child.flags() | Qt.ItemIsDragEnabled | Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+            items.append(child)
+            self.source_map[child_path] = group_key
+            # maintain insertion order
+            order.append(child_path)
+        if items:
+            root.addChildren(items)
 
     # ------------ UI behavior ------------
     def on_item_double_click(self, item, col):
-        d = item.data(0, Qt.UserRole)
-        if not d: return
-        if d.get('type') == 'image':
-            path = d.get('path')
-            self._show_preview(path)
+        if item.data(0, ROLE_KIND) == KIND_IMAGE:
+            self._show_preview(item.data(0, ROLE_VALUE))
 
     def _show_preview(self, path):
-        img = QImage(path)
+        w, h = self.preview_label.width(), self.preview_label.height()
+        key = (path, w, h)
+        self._preview_wanted = key
+        pm = self._preview_cache.get(key)
+        if pm is not None:
+            self._preview_cache.move_to_end(key)
+            self.preview_label.setPixmap(pm)
+            return
+        # decode off the UI thread; a loader already working on this key is reused
+        if any(l.key == key for l in self._preview_loaders):
+            return
+        loader = PreviewLoader(key)
+        loader.loaded.connect(self._on_preview_loaded)
+        # a bound method: a lambda holding the loader would keep every thread alive
+        loader.finished.connect(self._reap_preview_loaders)
+        self._preview_loaders.add(loader)
+        loader.start()
+
+    def _reap_preview_loaders(self):
+        # finished is emitted before the thread has stopped: wait() (immediate once
+        # run() has returned) before the last reference goes
+        for l in [l for l in self._preview_loaders if l.isFinished() or l.done.is_set()]:
+            l.wait()
+            self._preview_loaders.discard(l)
+
+    def _on_preview_loaded(self, key, img):
         if img.isNull():
+            pm = None
+        else:
+            pm = QPixmap.fromImage(img)
+            self._preview_cache[key] = pm
+            if len(self._preview_cache) > PREVIEW_CACHE_SIZE:
+                self._preview_cache.popitem(last=False)
+        # only the most recent request is shown; older results just warm the cache
+        if key != self._preview_wanted:
+            return
+        if pm is None:
             self.preview_label.setText(self.t('preview'))
             self.preview_label.setPixmap(QPixmap())
-            return
-        scaled = img.scaled(self.preview_label.width(), self.preview_label.height(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        self.preview_label.setPixmap(QPixmap.fromImage(scaled))
+        else:
+            self.preview_label.setPixmap(pm)
 
     # ------------ move up/down (group or child) ------------
     def move_up(self):
-        it = self.tree.currentItem()
-        if it is None: return
-        d = it.data(0, Qt.UserRole)
-        if not d: return
-        if d.get('type') == 'group':
-            idx = self.tree.indexOfTopLevelItem(it)
-            if idx > 0:
-                self.tree.takeTopLevelItem(idx)
-                self.tree.insertTopLevelItem(idx - 1, it)
-                self._rebuild_all_mappings()
-        elif d.get('type') == 'image':
-            parent = it.parent()
-            idx = parent.indexOfChild(it)
-            if idx > 0:
-                parent.removeChild(it)
-                parent.insertChild(idx - 1, it)
-                self._rebuild_all_mappings()
+        self._move_current(-1)
 
     def move_down(self):
+        self._move_current(1)
+
+    def _move_current(self, step):
         it = self.tree.currentItem()
         if it is None: return
-        d = it.data(0, Qt.UserRole)
-        if not d: return
-        if d.get('type') == 'group':
+        kind = it.data(0, ROLE_KIND)
+        if kind == KIND_GROUP:
             idx = self.tree.indexOfTopLevelItem(it)
-            if idx < self.tree.topLevelItemCount() - 1:
+            if 0 <= idx + step < self.tree.topLevelItemCount():
                 self.tree.takeTopLevelItem(idx)
-                self.tree.insertTopLevelItem(idx + 1, it)
-                self._rebuild_all_mappings()
-        elif d.get('type') == 'image':
+                self.tree.insertTopLevelItem(idx + step, it)
+                self._swap_group_order(idx, idx + step)
+        elif kind == KIND_IMAGE:
             parent = it.parent()
             idx = parent.indexOfChild(it)
-            if idx < parent.childCount() - 1:
+            if 0 <= idx + step < parent.childCount():
                 parent.removeChild(it)
-                parent.insertChild(idx + 1, it)
-                self._rebuild_all_mappings()
+                parent.insertChild(idx + step, it)
+                self._swap_in_group(parent, idx, idx + step)
+
+    def _swap_group_order(self, i, j):
+        # one step moved: swap the two keys instead of rescanning the whole tree
+        order = self.loaded_zip_order
+        a = self.tree.topLevelItem(j).data(0, ROLE_VALUE)
+        b = self.tree.topLevelItem(i).data(0, ROLE_VALUE)
+        if max(i, j) < len(order) and order[i] == a and order[j] == b:
+            order[i], order[j] = b, a
+        else:
+            self.loaded_zip_order = [self.tree.topLevelItem(k).data(0, ROLE_VALUE)
+                                     for k in range(self.tree.topLevelItemCount())]
+
+    def _swap_in_group(self, parent, i, j):
+        # the stored order follows the tree unless a Name/Number sort is showing;
+        # swap in place when it does, otherwise resync just this group
+        key = parent.data(0, ROLE_VALUE)
+        order = self.group_order.get(key)
+        a = parent.child(j).data(0, ROLE_VALUE)
+        b = parent.child(i).data(0, ROLE_VALUE)
+        if order is not None and max(i, j) < len(order) and order[i] == a and order[j] == b:
+            order[i], order[j] = b, a
+        else:
+            self.group_order[key] = [parent.child(k).data(0, ROLE_VALUE)
+                                     for k in range(parent.childCount())]
 
     def remove_selected(self):
         it = self.tree.currentItem()
         if it is None: return
-        d = it.data(0, Qt.UserRole)
-        if not d: return
-        if d.get('type') == 'group':
+        kind = it.data(0, ROLE_KIND)
+        if not kind: return
+        if kind == KIND_GROUP:
             idx = self.tree.indexOfTopLevelItem(it)
-            key = d.get('key')
+            key = it.data(0, ROLE_VALUE)
             tdir = self.group_tempdirs.get(key)
             if tdir:
-                try: shutil.rmtree(tdir, ignore_errors=True)
+                try: discard_tree(tdir)
                 except Exception: pass
                 self.group_tempdirs.pop(key, None)
             self.tree.takeTopLevelItem(idx)
             for i in range(it.childCount()):
                 child = it.child(i)
-                cp = child.data(0, Qt.UserRole).get('path')
+                cp = child.data(0, ROLE_VALUE)
                 try: del self.source_map[cp]
                 except Exception: pass
             try: del self.group_order[key]
             except Exception: pass
+            self.group_paths.pop(key, None)
             try: self.loaded_zip_order.remove(key)
             except Exception: pass
         else:
             parent = it.parent()
-            cp = it.data(0, Qt.UserRole).get('path')
+            cp = it.data(0, ROLE_VALUE)
+            key = parent.data(0, ROLE_VALUE)
             parent.removeChild(it)
+            # drop just this path from the mappings instead of re-walking the whole tree
+            self.group_paths.get(key, set()).discard(cp)
+            try: self.group_order.get(key, []).remove(cp)
+            except ValueError: pass
             try: del self.source_map[cp]
             except Exception: pass
-            self._rebuild_all_mappings()
 
     def clear_all(self):
-        for t in list(self.group_tempdirs.values()):
-            if t:
-                try: shutil.rmtree(t, ignore_errors=True)
-                except Exception: pass
+        try: discard_tree(*[t for t in self.group_tempdirs.values() if t])
+        except Exception: pass
         self.group_tempdirs.clear()
         self.tree.clear()
         self.source_map.clear()
         self.loaded_zip_order = []
         self.group_order.clear()
+        self.group_paths.clear()
+        self._preview_cache.clear()
+        self._preview_wanted = None
         self.preview_label.setText(self.t('preview'))
         self.preview_label.setPixmap(QPixmap())
 
@@ -664,27 +1173,27 @@ class ImageToPDF(QWidget):
     def apply_sorting(self):
         idx = self.sort_combo.currentIndex()
         mode = 'default' if idx == 0 else ('name' if idx == 1 else 'number')
-        for i in range(self.tree.topLevelItemCount()):
-            root = self.tree.topLevelItem(i)
-            d = root.data(0, Qt.UserRole)
-            if not d or d.get('type') != 'group':
-                continue
-            key = d.get('key')
-            children = [root.child(j).data(0, Qt.UserRole).get('path') for j in range(root.childCount())]
-            if mode == 'default':
-                order = self.group_order.get(key, children)
-            elif mode == 'name':
-                order = sorted(children, key=lambda p: os.path.basename(p).lower())
-            else:
-                order = sorted(children, key=lambda p: natural_key(os.path.basename(p)))
-            mapping = {root.child(j).data(0, Qt.UserRole).get('path'): root.child(j) for j in range(root.childCount())}
-            while root.childCount():
-                root.takeChild(0)
-            for p in order:
-                if p in mapping:
-                    root.addChild(mapping[p])
-            if mode == 'default':
-                self.group_order[key] = order
+        self._freeze_tree()
+        try:
+            for i in range(self.tree.topLevelItemCount()):
+                root = self.tree.topLevelItem(i)
+                if root.data(0, ROLE_KIND) != KIND_GROUP:
+                    continue
+                key = root.data(0, ROLE_VALUE)
+                items = root.takeChildren()
+                mapping = {c.data(0, ROLE_VALUE): c for c in items}
+                children = list(mapping)
+                if mode == 'default':
+                    order = self.group_order.get(key, children)
+                elif mode == 'name':
+                    order = sorted(children, key=lambda p: os.path.basename(p).lower())
+                else:
+                    order = sorted(children, key=lambda p: natural_key(os.path.basename(p)))
+                root.addChildren([mapping[p] for p in order if p in mapping])
+                if mode == 'default':
+                    self.group_order[key] = order
+        finally:
+            self._thaw_tree()
 
     # ------------ conversion UI flow ------------
     def convert_to_pdf(self):
@@ -692,21 +1201,24 @@ class ImageToPDF(QWidget):
         groups = []
         for i in range(self.tree.topLevelItemCount()):
             root = self.tree.topLevelItem(i)
-            d = root.data(0, Qt.UserRole)
-            if not d or d.get('type') != 'group':
+            if root.data(0, ROLE_KIND) != KIND_GROUP:
                 continue
-            group_name = d.get('key')
+            group_name = root.data(0, ROLE_VALUE)
             paths = []
             for j in range(root.childCount()):
                 child = root.child(j)
-                pd = child.data(0, Qt.UserRole)
-                if pd and pd.get('type') == 'image':
-                    paths.append(pd.get('path'))
+                if child.data(0, ROLE_KIND) == KIND_IMAGE:
+                    paths.append(child.data(0, ROLE_VALUE))
             groups.append((group_name, paths))
 
         if not groups:
             QMessageBox.warning(self, self.t('title'), self.t('no_images'))
             return
+        # both modes convert the same paths, so an empty selection is known before asking
+        total_images = sum(len(paths) for _, paths in groups)
+        if total_images <= 0:
+            QMessageBox.warning(self, self.t('title'), self.t('no_valid'))
+            return
 
         multiple_groups = len(groups) > 1
         combine_mode = False
@@ -723,70 +1235,26 @@ class ImageToPDF(QWidget):
             else:
                 combine_mode = True
 
-        groups_ordered = []
+        # the worker reads the files in list order, so the combined group is simply the
+        # concatenation of the tree's paths (no renumbered staging copies needed)
         if multiple_groups and not combine_mode:
-            for gname, paths in groups:
-                groups_ordered.append({
-                    'name': gname,
-                    'paths': paths,
-                    'tempdir': self.group_tempdirs.get(gname),
-                    'is_combined_group': False
-                })
+            groups_ordered = [{'name': gname, 'paths': paths} for gname, paths in groups]
         else:
-            # build combined temp and copy files with zero-padded sequence prefixes
-            combined_temp = tempfile.mkdtemp(prefix='saino_combined_', dir=self.base_temp_root)
-            all_paths = []
-            total_images = 0
-            for _, paths in groups:
-                total_images += len(paths)
-            pad = max(6, len(str(total_images)))
-            seq = 1
-            for i in range(self.tree.topLevelItemCount()):
-                root = self.tree.topLevelItem(i)
-                d = root.data(0, Qt.UserRole)
-                if not d or d.get('type') != 'group':
-                    continue
-                for j in range(root.childCount()):
-                    child = root.child(j)
-                    pd = child.data(0, Qt.UserRole)
-                    if pd and pd.get('type') == 'image':
-                        src = pd.get('path')
-                        ext = os.path.splitext(src)[1].lower()
-                        newname = f"{seq:0{pad}d}_{os.path.basename(src)}"
-                        dst = os.path.join(combined_temp, newname)
-                        try:
-                            shutil.copy2(src, dst)
-                            all_paths.append(dst)
-                        except Exception:
-                            all_paths.append(src)
-                        seq += 1
-            groups_ordered.append({
-                'name': '__COMBINED__',
-                'paths': all_paths,
-                'tempdir': combined_temp,
-                'is_combined_group': True
-            })
-
-        out_dir = os.path.join(os.getcwd(), 'output_pdfs'); os.makedirs(out_dir, exist_ok=True)
-        total_images = sum(len(g['paths']) for g in groups_ordered)
-        if total_images <= 0:
-            QMessageBox.warning(self, self.t('title'), self.t('no_valid'))
-            for g in groups_ordered:
-                tdir = g.get('tempdir')
-                if tdir and g.get('is_combined_group'):
-                    try: shutil.rmtree(tdir, ignore_errors=True)
-                    except Exception: pass
-            return
+            groups_ordered = [{'name': '__COMBINED__',
+                               'paths': [src for _, paths in groups for src in paths]}]
+
+        out_dir = self._default_out_dir; os.makedirs(out_dir, exist_ok=True)
 
         scale = self.scale_spin.value() / 100.0
         jpeg_q = self.jpeg_spin.value()
+        subsampling = self.subsampling_combo.currentText()
 
         self.progress_bar.setVisible(True)
         self.progress_bar.setMaximum(total_images)
         self.progress_bar.setValue(0)
         self.convert_btn.setEnabled(False)
 
-        self.worker = ConversionWorker(groups_ordered=groups_ordered, output_dir=out_dir, scale=scale, jpeg_quality=jpeg_q, clean_after_group=True)
+        self.worker = ConversionWorker(groups_ordered=groups_ordered, output_dir=out_dir, scale=scale, jpeg_quality=jpeg_q, subsampling=subsampling)
         self.worker.progress.connect(self._on_progress)
         self.worker.finished_signal.connect(self._on_finished)
         self.worker.error.connect(self._on_error)
@@ -794,7 +1262,7 @@ class ImageToPDF(QWidget):
 
     def _on_progress(self, v):
         try:
-            self.progress_bar.setValue(min(self.progress_bar.maximum(), v))
+            self.progress_bar.setValue(v)     # the worker never reports past the total
         except Exception:
             pass
 
@@ -821,93 +1289,97 @@ class ImageToPDF(QWidget):
         msg.exec()
         clicked = msg.clickedButton()
         if clicked == btn_open and btn_open is not None:
-            try:
-                if sys.platform.startswith('win'):
-                    os.startfile(created_pdfs[0])
-                elif sys.platform == 'darwin':
-                    subprocess.Popen(['open', created_pdfs[0]])
-                else:
-                    subprocess.Popen(['xdg-open', created_pdfs[0]])
-            except Exception:
-                pass
+            # native shell open, same as the folder button (no fork/exec of a helper)
+            QDesktopServices.openUrl(QUrl.fromLocalFile(created_pdfs[0]))
         elif clicked == btn_open_folder:
-            out_dir = os.path.dirname(created_pdfs[0]) if created_pdfs else os.path.join(os.getcwd(), 'output_pdfs')
-            try:
-                if sys.platform.startswith('win'):
-                    os.startfile(out_dir)
-                elif sys.platform == 'darwin':
-                    subprocess.Popen(['open', out_dir])
-                else:
-                    subprocess.Popen(['xdg-open', out_dir])
-            except Exception:
-                pass
+            out_dir = os.path.dirname(created_pdfs[0]) if created_pdfs else self._default_out_dir
+            QDesktopServices.openUrl(QUrl.fromLocalFile(out_dir))
 
         if skipped_all:
-            warn = self.t('skipped') + '\n' + '\n'.join([f"{os.path.basename(p)}: {r}" for p, r in skipped_all[:10]])
-            if len(skipped_all) > 10:
-                warn += f"\n...and {len(skipped_all)-10} more"
+            n = len(skipped_all)
+            warn = self.t('skipped') + '\n' + '\n'.join(f"{p.rpartition(os.sep)[2]}: {r}" for p, r in islice(skipped_all, 10))
+            if n > 10:
+                warn += f"\n...and {n-10} more"
             QMessageBox.warning(self, self.t('title'), warn)
 
     def _cleanup_after_worker(self):
-        try:
-            if self.worker and self.worker.isRunning():
-                self.worker.cancel(); self.worker.wait(1000)
-        except Exception:
-            pass
-        self.worker = None
+        w, self.worker = self.worker, None
+        if w is not None and not w.isFinished():
+            # don't block the UI on a guessed timeout: keep the thread referenced
+            # until the QThread itself has finished (done is set while it still unwinds)
+            w.cancel()
+            # a canceled run still reports: keep its results away from the next conversion
+            for sig in (w.progress, w.finished_signal, w.error):
+                try:
+                    sig.disconnect()
+                except Exception:
+                    pass
+            self._retired_workers.add(w)
+            w.finished.connect(self._reap_workers)
+            if w.isFinished():
+                self._reap_workers()
         self.convert_btn.setEnabled(True)
         self.progress_bar.setVisible(False)
         self.progress_bar.setValue(0)
-        gc.collect()
+
+    def _reap_workers(self):
+        # run() has returned for these, so wait() only covers the last few instructions
+        for w in [w for w in self._retired_workers if w.isFinished() or w.done.is_set()]:
+            w.wait()
+            self._retired_workers.discard(w)
 
     def toggle_language(self):
         self.lang = LANG_EN if self.lang == LANG_FA else LANG_FA
-        self.t = lambda k: STRINGS[self.lang].get(k, k)
+        self._s = STRINGS[self.lang]
         self.setWindowTitle(self.t('title'))
-        self.load_folder_btn.setText(self.t('load_folder'))
-        self.load_zip_btn.setText(self.t('load_zip'))
-        self.up_btn.setText(self.t('move_up'))
-        self.down_btn.setText(self.t('move_down'))
-        self.remove_btn.setText(self.t('remove'))
-        self.clear_btn.setText(self.t('clear'))
-        self.convert_btn.setText(self.t('convert'))
-        self.lang_btn.setText(self.t('lang_toggle'))
-        # rebuild sort combo entries
-        self.sort_combo.blockSignals(True)
-        self.sort_combo.clear()
-        self.sort_combo.addItems([self.t('sort_default'), self.t('sort_name'), self.t('sort_number')])
-        self.sort_combo.blockSignals(False)
-        # update preview
-        self.preview_label.setText(self.t('preview'))
+        for w, k in self._i18n_widgets.items():
+            w.setText(self.t(k))
+        # relabel sort combo entries in place (no model reset, current mode is kept)
+        for i, k in enumerate(('sort_default', 'sort_name', 'sort_number')):
+            self.sort_combo.setItemText(i, self.t(k))
+        # update preview placeholder (setText would drop a shown image)
+        if self.preview_label.pixmap().isNull():
+            self.preview_label.setText(self.t('preview'))
         # update dropped group name if exists
         dropped_item = self._find_group_item('__DROPPED__')
         if dropped_item:
             dropped_item.setText(0, self.t('dropped_images'))
 
     def closeEvent(self, ev):
-        # Cancel conversion worker and wait
-        try:
-            if self.worker and self.worker.isRunning():
-                self.worker.cancel()
-                self.worker.wait(1000)
-        except Exception:
-            pass
-        # Stop cleanup worker and wait
-        try:
-            if hasattr(self, 'cleanup_worker') and self.cleanup_worker.isRunning():
-                self.cleanup_worker.stop()
-                self.cleanup_worker.wait(1000)
-        except Exception:
-            pass
-        # Remove temp dirs
-        try:
-            if os.path.exists(self.base_temp_root):
-                shutil.rmtree(self.base_temp_root, ignore_errors=True)
-            for t in list(self.group_tempdirs.values()):
-                if t:
-                    shutil.rmtree(t, ignore_errors=True)
-        except Exception:
-            pass
+        # events are pumped while waiting below: a second close request is ignored
+        # and the disabled window takes no input (no new conversion can start)
+        if self._closing:
+            ev.ignore()
+            return
+        self._closing = True
+        self.setEnabled(False)
+        # Cancel conversion workers and wait until they have really stopped
+        # (they check the cancel flag per image), keeping the window responsive
+        workers = list(self._retired_workers)
+        if self.worker is not None:
+            workers.append(self.worker)
+        for w in workers:
+            w.blockSignals(True)    # no result dialogs while closing
+            w.cancel()
+        # the cleanup worker checks its stop flag between entries
+        cleanup = getattr(self, 'cleanup_worker', None)
+        if cleanup is not None:
+            cleanup.stop()
+            workers.append(cleanup)
+        # wake as soon as each thread signals it is done instead of a fixed timeout
+        for w in workers:
+            while w.isRunning() and not w.done.wait(0.05):
+                QApplication.processEvents()
+            w.wait()    # done is set just before the thread exits: this returns at once
+        # preview decodes are short: let them finish without delivering anything
+        for l in list(self._preview_loaders):
+            l.blockSignals(True)
+            l.wait()
+        # Remove temp dirs (group temps normally live inside base_temp_root)
+        roots = [self.base_temp_root]
+        roots += [t for t in self.group_tempdirs.values()
+                  if t and not t.startswith(self.base_temp_root + os.sep)]
+        remove_tree_async([t for t in roots if os.path.exists(t)], detached=True)
         super().closeEvent(ev)
         # Ensure QApplication exits when window closed
         QApplication.quit()